@@ -43,6 +43,7 @@ def connect(c: Context, command="bash -l", service="django", profile=DEFAULT_PRO
         "stacks": STACKS_HELP,
         "verbose": "Enable verbose output",
         "skip_approval": "Do not prompt for approval before deploying",
+        "concurrency": "Number of independent stacks to deploy in parallel. Defaults to 1.",
     }
     | PROFILE_HELP,
     auto_shortflags=False,
@@ -53,6 +54,7 @@ def deploy(
     verbose=False,
     profile=DEFAULT_PROFILE,
     skip_approval=False,
+    concurrency=1,
 ):
     """Deploy the specified stacks. If no stacks are specified, all stacks will be deployed."""
     profile = get_profile_and_auth(c, profile)
@@ -71,6 +73,8 @@ def deploy(
     cmd += f" --profile {profile} --context ocs_env={config.environment}"
     cmd += " --require-approval " + ("never" if skip_approval else "any-change")
     cmd += " --progress events"
+    if concurrency > 1:
+        cmd += f" --concurrency {concurrency}"
     c.run(cmd, echo=True, pty=True)
 
 
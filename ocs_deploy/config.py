@@ -1,4 +1,5 @@
 import dataclasses
+import functools
 import re
 from datetime import datetime
 from pathlib import Path
@@ -42,6 +43,8 @@ class OCSConfig:
     LOG_GROUP_CELERY = "CeleryWorkerLogs"
     LOG_GROUP_BEAT = "CeleryBeatLogs"
 
+    CPU_ARCHITECTURES = {"X86_64", "ARM64"}
+
     def __init__(self, env: str):
         if not env:
             raise Exception("No environment specified")
@@ -50,6 +53,7 @@ class OCSConfig:
         if not env_path.exists():
             raise Exception(f"Environment file not found: {env_path}")
 
+        self._name_cache = {}
         config = dotenv_values(env_path)
         self.environment = env
         self.account = config["CDK_ACCOUNT"]
@@ -73,6 +77,30 @@ class OCSConfig:
         self.sentry_environment = config.get("SENTRY_ENVIRONMENT", "development")
 
         self.github_repo = config.get("GITHUB_REPO", "dimagi/open-chat-studio")
+        self.image_digest = config.get("IMAGE_DIGEST", "").strip()
+        if self.image_digest and not self.image_digest.startswith("sha256:"):
+            raise Exception(
+                f"Invalid IMAGE_DIGEST: {self.image_digest}. "
+                "Must be an image digest starting with 'sha256:' or empty."
+            )
+        # Must match the architecture of the image
+        self.cpu_architecture = config.get("CPU_ARCHITECTURE", "X86_64").strip().upper()
+        if self.cpu_architecture not in self.CPU_ARCHITECTURES:
+            raise Exception(
+                f"Invalid CPU_ARCHITECTURE: {self.cpu_architecture}. "
+                f"Must be one of: {', '.join(sorted(self.CPU_ARCHITECTURES))}"
+            )
+        self.container_insights_enabled = (
+            config.get("CONTAINER_INSIGHTS_ENABLED", "True").lower() == "true"
+        )
+        # Name of an aws_logs.RetentionDays member e.g. TWO_YEARS
+        self.waf_log_retention = (
+            config.get("WAF_LOG_RETENTION", "TWO_YEARS").strip().upper()
+        )
+        # Leave empty to track the default version of the managed rule group
+        self.waf_common_rule_set_version = config.get(
+            "WAF_COMMON_RULE_SET_VERSION", "Version_1.12"
+        )
 
     def stack_name(self, name: str):
         if name not in self.ALL_STACKS:
@@ -85,10 +113,16 @@ class OCSConfig:
         return cdk.Environment(account=self.account, region=self.region)
 
     def make_name(self, name: str = "", include_region=False):
-        name = f"-{name}" if name else ""
-        if include_region:
-            return f"{self.app_name}-{self.environment}-{self.region}{name}"
-        return f"{self.app_name}-{self.environment}{name}"
+        key = (name, include_region)
+        if key not in self._name_cache:
+            suffix = f"-{name}" if name else ""
+            if include_region:
+                self._name_cache[key] = (
+                    f"{self.app_name}-{self.environment}-{self.region}{suffix}"
+                )
+            else:
+                self._name_cache[key] = f"{self.app_name}-{self.environment}{suffix}"
+        return self._name_cache[key]
 
     def make_secret_name(self, name: str):
         if re.match(r"-[a-zA-Z]{6}$", name):
@@ -128,6 +162,13 @@ class OCSConfig:
     def ecr_repo_name(self):
         return self.make_name("ecr-repo")
 
+    @property
+    def image_tag(self):
+        """Tag or digest of the image used by the ECS tasks.
+
+        Pinning to a digest (``sha256:...``) avoids resolving ``latest`` on task start."""
+        return self.image_digest or "latest"
+
     @property
     def ecs_task_role_name(self):
         return self.make_name("ecs-task-role")
@@ -157,6 +198,10 @@ class OCSConfig:
     def s3_whatsapp_audio_bucket(self):
         return self.make_name("s3-whatsapp-audio")
 
+    @property
+    def s3_waf_logs_bucket_name(self):
+        return self.make_name("s3-waf-logs")
+
     def normalize_secret_name(self, name):
         prefix = self.make_secret_name("")
         if not name.startswith(prefix):
@@ -170,6 +215,11 @@ class OCSConfig:
             raise ValueError(f"Secret not found: {name}")
         return found[0]
 
+    @functools.cached_property
+    def unmanaged_secrets(self):
+        """Secrets that are not created by the CDK stacks."""
+        return tuple(secret for secret in self.get_secrets_list() if not secret.managed)
+
     def get_secrets_list(self):
         path = Path(__file__).parent / "secrets.yml"
         with path.open() as f:
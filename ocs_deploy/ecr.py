@@ -20,19 +20,20 @@ class EcrStack(cdk.Stack):
             config.make_name("ECR"),
             repository_name=config.ecr_repo_name,
             removal_policy=cdk.RemovalPolicy.DESTROY,
-        )
-        ecr_repo.add_lifecycle_rule(
-            max_image_age=cdk.Duration.days(7),
-            rule_priority=1,
-            tag_status=ecr.TagStatus.UNTAGGED,
-        )
-        ecr_repo.add_lifecycle_rule(
-            max_image_count=4, rule_priority=2, tag_status=ecr.TagStatus.ANY
+            # Untagged images are expired first, the image count rule then applies
+            # to everything that is left.
+            lifecycle_rules=[
+                ecr.LifecycleRule(
+                    max_image_age=cdk.Duration.days(7),
+                    rule_priority=1,
+                    tag_status=ecr.TagStatus.UNTAGGED,
+                ),
+                ecr.LifecycleRule(
+                    max_image_count=4, rule_priority=2, tag_status=ecr.TagStatus.ANY
+                ),
+            ],
         )
 
-        cdk.CfnOutput(
-            self, config.make_name("ECRRepositoryArn"), value=ecr_repo.repository_arn
-        )
         cdk.CfnOutput(
             self, config.make_name("ECRRepositoryUri"), value=ecr_repo.repository_uri
         )
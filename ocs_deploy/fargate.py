@@ -4,7 +4,6 @@ import aws_cdk as cdk
 from aws_cdk import (
     aws_ec2 as ec2,
     aws_ecs as ecs,
-    aws_ecs_patterns as ecs_patterns,
     aws_iam as iam,
     aws_logs as logs,
     aws_elasticloadbalancingv2 as elb,
@@ -17,6 +16,32 @@ from ocs_deploy.config import OCSConfig
 CONTAINER_PORT = 8000
 
 
+def _build_environment(rds_stack, config: OCSConfig, container_port):
+    """Environment variables shared by all the containers."""
+    return {
+        "ACCOUNT_EMAIL_VERIFICATION": "mandatory",
+        "AWS_PRIVATE_STORAGE_BUCKET_NAME": config.s3_private_bucket_name,
+        "AWS_PUBLIC_STORAGE_BUCKET_NAME": config.s3_public_bucket_name,
+        "AWS_S3_REGION": config.region,
+        "DJANGO_DATABASE_NAME": config.rds_db_name,
+        "DJANGO_DATABASE_HOST": rds_stack.db_instance.instance_endpoint.hostname,
+        "DJANGO_DATABASE_PORT": rds_stack.db_instance.db_instance_endpoint_port,
+        "DJANGO_EMAIL_BACKEND": "anymail.backends.amazon_ses.EmailBackend",
+        "DJANGO_SECURE_SSL_REDIRECT": "false",  # handled by the load balancer
+        "DJANGO_SETTINGS_MODULE": "gpt_playground.settings_production",
+        "PORT": str(container_port),
+        "PRIVACY_POLICY_URL": config.privacy_policy_url,
+        "TERMS_URL": config.terms_url,
+        "SIGNUP_ENABLED": config.signup_enabled,
+        "SLACK_BOT_NAME": config.slack_bot_name,
+        "USE_S3_STORAGE": "True",
+        "WHATSAPP_S3_AUDIO_BUCKET": config.s3_whatsapp_audio_bucket,
+        "TASKBADGER_ORG": config.taskbadger_org,
+        "TASKBADGER_PROJECT": config.taskbadger_project,
+        "SENTRY_ENVIRONMENT": config.sentry_environment,
+    }
+
+
 class FargateStack(cdk.Stack):
     """
     Represents a CDK stack for deploying a Fargate service within a VPC.
@@ -42,55 +67,87 @@ class FargateStack(cdk.Stack):
         )
 
         self.config = config
+        self.ecr_repo = ecr_repo
         self.rds_stack = rds_stack
         self.redis_stack = redis_stack
         self.domain_stack = domain_stack
+        self._secret_cache = {}
 
         self.fargate_service = self.setup_fargate_service(vpc, ecr_repo, config)
         # Expose ALB ARN for WAF
-        self.load_balancer_arn = self.fargate_service.load_balancer.load_balancer_arn
+        self.load_balancer_arn = self.load_balancer.load_balancer_arn
 
     def setup_fargate_service(self, vpc, ecr_repo, config: OCSConfig):
-        http_sg = ec2.SecurityGroup(
-            self, config.make_name("HttpSG"), vpc=vpc, allow_all_outbound=True
-        )
-        http_sg.add_ingress_rule(ec2.Peer.any_ipv4(), ec2.Port.tcp(80))
+        ecr_repo.grant_pull(self.execution_role)
 
-        https_sg = ec2.SecurityGroup(
-            self, config.make_name("HttpsSG"), vpc=vpc, allow_all_outbound=True
+        web_sg = ec2.SecurityGroup(
+            self, config.make_name("WebSG"), vpc=vpc, allow_all_outbound=True
         )
-        https_sg.add_ingress_rule(ec2.Peer.any_ipv4(), ec2.Port.tcp(443))
+        web_sg.add_ingress_rule(ec2.Peer.any_ipv4(), ec2.Port.tcp(80))
+        web_sg.add_ingress_rule(ec2.Peer.any_ipv4(), ec2.Port.tcp(443))
 
         # define a cluster with spot instances, linux type
         cluster = ecs.Cluster(
             self,
             config.make_name("DeploymentCluster"),
             vpc=vpc,
-            container_insights=True,
+            container_insights=config.container_insights_enabled,
             cluster_name=config.ecs_cluster_name,
         )
 
         # See https://blog.cloudglance.dev/deep-dive-on-ecs-desired-count-and-circuit-breaker-rollback/index.html
         django_max_capacity = 5
-        django_web_service = ecs_patterns.ApplicationLoadBalancedFargateService(
-            self,
-            config.make_name("DjangoWebService"),
+        # Construct ids match ecs_patterns.ApplicationLoadBalancedFargateService, which
+        # was used previously, so that the existing resources are not replaced.
+        web_scope = Construct(self, config.make_name("DjangoWebService"))
+        self.load_balancer = elb.ApplicationLoadBalancer(
+            web_scope,
+            "LB",
+            vpc=vpc,
+            internet_facing=True,
+            load_balancer_name=config.make_name("LoadBalancer"),
+        )
+        django_web_service = ecs.FargateService(
+            web_scope,
+            "Service",
             cluster=cluster,
-            security_groups=[http_sg, https_sg],
+            security_groups=[web_sg],
             desired_count=django_max_capacity,
-            public_load_balancer=True,
-            load_balancer_name=config.make_name("LoadBalancer"),
             service_name=config.ecs_django_service_name,
-            certificate=self.domain_stack.certificate,
-            redirect_http=True,
-            protocol=elb.ApplicationProtocol.HTTPS,
-            task_definition=self._get_web_task_definition(ecr_repo, config),
+            task_definition=self._get_web_task_definition(config),
             enable_execute_command=True,
             circuit_breaker=ecs.DeploymentCircuitBreaker(enable=True, rollback=True),
+            platform_version=ecs.FargatePlatformVersion.LATEST,
+        )
+
+        https_listener = self.load_balancer.add_listener(
+            "PublicListener",
+            protocol=elb.ApplicationProtocol.HTTPS,
+            port=443,
+            open=True,
+            certificates=[
+                elb.ListenerCertificate.from_certificate_manager(
+                    self.domain_stack.certificate
+                )
+            ],
+        )
+        https_listener.add_targets(
+            "ECS",
+            protocol=elb.ApplicationProtocol.HTTP,
+            targets=[django_web_service],
+        )
+        self.load_balancer.add_listener(
+            "PublicRedirectListener",
+            protocol=elb.ApplicationProtocol.HTTP,
+            port=80,
+            open=True,
+            default_action=elb.ListenerAction.redirect(
+                port="443", protocol="HTTPS", permanent=True
+            ),
         )
 
         # Setup AutoScaling policy
-        scaling = django_web_service.service.auto_scale_task_count(
+        scaling = django_web_service.auto_scale_task_count(
             max_capacity=django_max_capacity,
             min_capacity=2,
         )
@@ -105,7 +162,7 @@ class FargateStack(cdk.Stack):
         cdk.CfnOutput(
             self,
             config.make_name("DjangoWebDNS"),
-            value=django_web_service.load_balancer.load_balancer_dns_name,
+            value=self.load_balancer.load_balancer_dns_name,
         )
 
         # See https://blog.cloudglance.dev/deep-dive-on-ecs-desired-count-and-circuit-breaker-rollback/index.html
@@ -116,11 +173,10 @@ class FargateStack(cdk.Stack):
             cluster=cluster,
             desired_count=celery_max_capacity,
             service_name=config.ecs_celery_service_name,
-            task_definition=self._get_celery_task_definition(
-                ecr_repo, config, is_beat=False
-            ),
+            task_definition=self._get_celery_task_definition(config, is_beat=False),
             enable_execute_command=True,
             circuit_breaker=ecs.DeploymentCircuitBreaker(enable=True, rollback=True),
+            platform_version=ecs.FargatePlatformVersion.LATEST,
         )
 
         celery_scaling = celery_worker_service.auto_scale_task_count(
@@ -140,11 +196,10 @@ class FargateStack(cdk.Stack):
             cluster=cluster,
             desired_count=1,
             service_name=config.ecs_celery_beat_service_name,
-            task_definition=self._get_celery_task_definition(
-                ecr_repo, config, is_beat=True
-            ),
+            task_definition=self._get_celery_task_definition(config, is_beat=True),
             enable_execute_command=True,
             circuit_breaker=ecs.DeploymentCircuitBreaker(enable=True, rollback=True),
+            platform_version=ecs.FargatePlatformVersion.LATEST,
             # we only ever want 1 beat service running
             max_healthy_percent=100,
             min_healthy_percent=0,
@@ -152,13 +207,9 @@ class FargateStack(cdk.Stack):
 
         return django_web_service
 
-    def _get_web_task_definition(self, ecr_repo, config: OCSConfig):
-        log_group = self._get_log_group(config.make_name(config.LOG_GROUP_DJANGO))
-        log_driver = ecs.AwsLogDriver(
-            stream_prefix=config.make_name(), log_group=log_group
-        )
+    def _get_web_task_definition(self, config: OCSConfig):
+        log_driver = self._get_log_driver(config, config.LOG_GROUP_DJANGO)
 
-        image = ecs.ContainerImage.from_ecr_repository(ecr_repo, tag="latest")
         django_task = ecs.FargateTaskDefinition(
             self,
             id=config.make_name("Django"),
@@ -167,28 +218,29 @@ class FargateStack(cdk.Stack):
             execution_role=self.execution_role,
             task_role=self.task_role,
             family=config.make_name("Django"),
+            runtime_platform=self.runtime_platform,
+        )
+        # both containers share the same image, environment, secrets and logging
+        common = dict(
+            image=self.image,
+            environment=self.env_dict,
+            secrets=self.secrets_dict,
+            logging=log_driver,
         )
         migration_container = django_task.add_container(
             id="django_container",
-            image=image,
             container_name="migrate",
             command=["python", "manage.py", "migrate"],
             health_check=None,
             essential=False,
-            environment=self.env_dict,
-            secrets=self.secrets_dict,
-            logging=log_driver,
+            **common,
         )
 
         webserver_container = django_task.add_container(
             id="web",
-            image=image,
             container_name="web",
             essential=True,
             port_mappings=[ecs.PortMapping(container_port=CONTAINER_PORT)],
-            environment=self.env_dict,
-            secrets=self.secrets_dict,
-            logging=log_driver,
             health_check=ecs.HealthCheck(
                 command=[
                     "CMD-SHELL",
@@ -198,6 +250,7 @@ class FargateStack(cdk.Stack):
                 timeout=cdk.Duration.seconds(5),
                 retries=4,
             ),
+            **common,
         )
 
         webserver_container.add_container_dependencies(
@@ -209,16 +262,29 @@ class FargateStack(cdk.Stack):
 
         return django_task
 
+    def _get_log_driver(self, config: OCSConfig, log_group_name):
+        log_group = self._get_log_group(config.make_name(log_group_name))
+        # Don't block the application when CloudWatch Logs throttles, logs are
+        # buffered in memory instead.
+        return ecs.AwsLogDriver(
+            stream_prefix=config.make_name(),
+            log_group=log_group,
+            mode=ecs.AwsLogDriverMode.NON_BLOCKING,
+            max_buffer_size=cdk.Size.mebibytes(25),
+        )
+
     def _get_log_group(self, name):
-        return logs.LogGroup(
+        log_group = logs.LogGroup(
             self,
             name,
             log_group_name=name,
             removal_policy=cdk.RemovalPolicy.RETAIN,
             retention=logs.RetentionDays.TWO_YEARS,
         )
+        log_group.grant_write(self.execution_role)
+        return log_group
 
-    def _get_celery_task_definition(self, ecr_repo, config: OCSConfig, is_beat):
+    def _get_celery_task_definition(self, config: OCSConfig, is_beat):
         if is_beat:
             log_group_name = config.LOG_GROUP_BEAT
             name = "CeleryBeatTask"
@@ -258,12 +324,7 @@ class FargateStack(cdk.Stack):
             #     retries=4,
             # )
 
-        log_group = self._get_log_group(config.make_name(log_group_name))
-        log_driver = ecs.AwsLogDriver(
-            stream_prefix=config.make_name(), log_group=log_group
-        )
-
-        image = ecs.ContainerImage.from_ecr_repository(ecr_repo, tag="latest")
+        log_driver = self._get_log_driver(config, log_group_name)
 
         celery_task = ecs.FargateTaskDefinition(
             self,
@@ -273,11 +334,12 @@ class FargateStack(cdk.Stack):
             execution_role=self.execution_role,
             task_role=self.task_role,
             family=config.make_name(name),
+            runtime_platform=self.runtime_platform,
         )
 
         celery_task.add_container(
             id=container_name,
-            image=image,
+            image=self.image,
             container_name=container_name,
             essential=True,
             environment=self.env_dict,
@@ -289,6 +351,21 @@ class FargateStack(cdk.Stack):
 
         return celery_task
 
+    @cached_property
+    def runtime_platform(self):
+        """Runtime platform of the tasks. The image must match the architecture."""
+        return ecs.RuntimePlatform(
+            cpu_architecture=getattr(ecs.CpuArchitecture, self.config.cpu_architecture),
+            operating_system_family=ecs.OperatingSystemFamily.LINUX,
+        )
+
+    @cached_property
+    def image(self):
+        """Container image shared by all the task definitions."""
+        return ecs.ContainerImage.from_ecr_repository(
+            self.ecr_repo, tag=self.config.image_tag
+        )
+
     @cached_property
     def secrets_dict(self):
         django_secret_key = secretsmanager.Secret(
@@ -299,12 +376,15 @@ class FargateStack(cdk.Stack):
                 password_length=50,
             ),
         )
+        # Both database fields reference the same secret ARN using JSON keys so that
+        # ECS only has to retrieve the secret once per task.
+        rds_secret = self.rds_stack.db_instance.secret
         secrets = {
             "DJANGO_DATABASE_USER": ecs.Secret.from_secrets_manager(
-                self.rds_stack.db_instance.secret, field="username"
+                rds_secret, field="username"
             ),
             "DJANGO_DATABASE_PASSWORD": ecs.Secret.from_secrets_manager(
-                self.rds_stack.db_instance.secret, field="password"
+                rds_secret, field="password"
             ),
             "REDIS_URL": ecs.Secret.from_secrets_manager(
                 self.redis_stack.redis_url_secret
@@ -316,40 +396,29 @@ class FargateStack(cdk.Stack):
             # "AWS_SES_REGION":
             # "AWS_SES_SECRET_KEY":
         }
-        for secret in self.config.get_secrets_list():
-            if secret.managed:
-                continue
+        self._import_secrets([secret.name for secret in self.config.unmanaged_secrets])
+        for secret in self.config.unmanaged_secrets:
             secrets[secret.env_var] = ecs.Secret.from_secrets_manager(
-                secretsmanager.Secret.from_secret_name_v2(
-                    self, secret.name, secret.name
-                )
+                self._secret_cache[secret.name]
             )
         return secrets
 
+    def _import_secrets(self, names):
+        """Import the externally managed secrets in a single pass.
+
+        Secrets are referenced by name only, no lookups are made at synth time. ECS
+        resolves the values when the task starts. Each name is only imported once,
+        regardless of how many times it is requested.
+        """
+        unique_names = {name for name in names if name not in self._secret_cache}
+        for name in sorted(unique_names):
+            self._secret_cache[name] = secretsmanager.Secret.from_secret_name_v2(
+                self, name, name
+            )
+
     @cached_property
     def env_dict(self):
-        return {
-            "ACCOUNT_EMAIL_VERIFICATION": "mandatory",
-            "AWS_PRIVATE_STORAGE_BUCKET_NAME": self.config.s3_private_bucket_name,
-            "AWS_PUBLIC_STORAGE_BUCKET_NAME": self.config.s3_public_bucket_name,
-            "AWS_S3_REGION": self.config.region,
-            "DJANGO_DATABASE_NAME": self.config.rds_db_name,
-            "DJANGO_DATABASE_HOST": self.rds_stack.db_instance.instance_endpoint.hostname,
-            "DJANGO_DATABASE_PORT": self.rds_stack.db_instance.db_instance_endpoint_port,
-            "DJANGO_EMAIL_BACKEND": "anymail.backends.amazon_ses.EmailBackend",
-            "DJANGO_SECURE_SSL_REDIRECT": "false",  # handled by the load balancer
-            "DJANGO_SETTINGS_MODULE": "gpt_playground.settings_production",
-            "PORT": str(CONTAINER_PORT),
-            "PRIVACY_POLICY_URL": self.config.privacy_policy_url,
-            "TERMS_URL": self.config.terms_url,
-            "SIGNUP_ENABLED": self.config.signup_enabled,
-            "SLACK_BOT_NAME": self.config.slack_bot_name,
-            "USE_S3_STORAGE": "True",
-            "WHATSAPP_S3_AUDIO_BUCKET": self.config.s3_whatsapp_audio_bucket,
-            "TASKBADGER_ORG": self.config.taskbadger_org,
-            "TASKBADGER_PROJECT": self.config.taskbadger_project,
-            "SENTRY_ENVIRONMENT": self.config.sentry_environment,
-        }
+        return _build_environment(self.rds_stack, self.config, CONTAINER_PORT)
 
     @cached_property
     def execution_role(self):
@@ -366,21 +435,6 @@ class FargateStack(cdk.Stack):
                 "service-role/AmazonECSTaskExecutionRolePolicy"
             )
         )
-        # Add permissions to the Task Role to allow it to pull images from ECR
-        execution_role.add_to_policy(
-            iam.PolicyStatement(
-                effect=iam.Effect.ALLOW,
-                actions=[
-                    "ecr:GetAuthorizationToken",
-                    "ecr:BatchCheckLayerAvailability",
-                    "ecr:GetDownloadUrlForLayer",
-                    "ecr:BatchGetImage",
-                    "logs:CreateLogStream",
-                    "logs:PutLogEvents",
-                ],
-                resources=["*"],
-            )
-        )
         return execution_role
 
     @cached_property
@@ -392,26 +446,32 @@ class FargateStack(cdk.Stack):
             assumed_by=iam.ServicePrincipal("ecs-tasks.amazonaws.com"),
             role_name=self.config.ecs_task_role_name,
         )
+        buckets = [
+            self.config.s3_private_bucket_name,
+            self.config.s3_public_bucket_name,
+            self.config.s3_whatsapp_audio_bucket,
+        ]
+        task_role.add_to_policy(
+            iam.PolicyStatement(
+                actions=[
+                    "s3:ListBucket",
+                    "s3:GetBucketAcl",
+                ],
+                effect=iam.Effect.ALLOW,
+                resources=[f"arn:aws:s3:::{bucket}" for bucket in buckets],
+            )
+        )
         task_role.add_to_policy(
             iam.PolicyStatement(
                 actions=[
                     "s3:PutObject",
                     "s3:GetObjectAcl",
                     "s3:GetObject",
-                    "s3:ListBucket",
                     "s3:DeleteObject",
                     "s3:PutObjectAcl",
-                    "s3:GetBucketAcl",
                 ],
                 effect=iam.Effect.ALLOW,
-                resources=[
-                    f"arn:aws:s3:::{self.config.s3_private_bucket_name}",
-                    f"arn:aws:s3:::{self.config.s3_private_bucket_name}/*",
-                    f"arn:aws:s3:::{self.config.s3_public_bucket_name}",
-                    f"arn:aws:s3:::{self.config.s3_public_bucket_name}/*",
-                    f"arn:aws:s3:::{self.config.s3_whatsapp_audio_bucket}",
-                    f"arn:aws:s3:::{self.config.s3_whatsapp_audio_bucket}/*",
-                ],
+                resources=[f"arn:aws:s3:::{bucket}/*" for bucket in buckets],
             )
         )
         task_role.add_to_policy(
@@ -1,5 +1,16 @@
 ﻿# ocs_deploy/stacks/waf.py
-from aws_cdk import Stack, RemovalPolicy, aws_wafv2 as wafv2, aws_logs as logs, aws_iam as iam, CfnOutput
+from aws_cdk import (
+    Stack,
+    ArnFormat,
+    Duration,
+    RemovalPolicy,
+    aws_wafv2 as wafv2,
+    aws_logs as logs,
+    aws_iam as iam,
+    aws_kinesisfirehose as firehose,
+    aws_s3 as s3,
+    CfnOutput,
+)
 from constructs import Construct
 from ocs_deploy.config import OCSConfig
 
@@ -7,6 +18,7 @@ class WAFStack(Stack):
     """
     Represents a CDK stack for deploying a WAF Web ACL associated with an Application Load Balancer.
     Includes AWS Managed Rules and rate limiting in count mode, with logging to CloudWatch.
+    The logs are also streamed to an S3 bucket via Firehose for long term archival.
     """
 
     def __init__(
@@ -42,6 +54,7 @@ class WAFStack(Stack):
                         managed_rule_group_statement=wafv2.CfnWebACL.ManagedRuleGroupStatementProperty(
                             vendor_name="AWS",
                             name="AWSManagedRulesCommonRuleSet",
+                            version=config.waf_common_rule_set_version or None,
                         )
                     ),
                     override_action=wafv2.CfnWebACL.OverrideActionProperty(count={}),
@@ -84,7 +97,7 @@ class WAFStack(Stack):
             self,
             "WAFLogGroup",
             log_group_name=f"aws-waf-logs-{config.make_name('waf-logs')}",
-            retention=logs.RetentionDays.TWO_YEARS,
+            retention=self._get_log_retention(config),
             removal_policy=RemovalPolicy.RETAIN,
         )
 
@@ -97,17 +110,27 @@ class WAFStack(Stack):
             )
         )
 
+        # WAF expects the log group ARN without the trailing ':*'
+        log_destination_arn = Stack.of(self).format_arn(
+            service="logs",
+            resource="log-group",
+            resource_name=log_group.log_group_name,
+            arn_format=ArnFormat.COLON_RESOURCE_NAME,
+        )
+
         # Add WAF Logging Configuration
         logging_config = wafv2.CfnLoggingConfiguration(
             self,
             "WAFLoggingConfig",
             resource_arn=self.web_acl.attr_arn,
-            log_destination_configs=[log_group.log_group_arn.replace(":*", "")],
+            log_destination_configs=[log_destination_arn],
         )
 
         # Ensure the log group policy is applied before the logging configuration
         logging_config.node.add_dependency(log_group)
 
+        self._setup_log_archive(config, log_group)
+
         # Output the Web ACL ARN
         CfnOutput(
             self,
@@ -116,10 +139,106 @@ class WAFStack(Stack):
             description="ARN of the WAF Web ACL",
         )
 
-        # Output the Log Group ARN
-        CfnOutput(
+    def _get_log_retention(self, config: OCSConfig):
+        try:
+            return logs.RetentionDays[config.waf_log_retention]
+        except KeyError:
+            valid = ", ".join(retention.name for retention in logs.RetentionDays)
+            raise Exception(
+                f"Invalid WAF_LOG_RETENTION: {config.waf_log_retention}. "
+                f"Must be one of: {valid}"
+            ) from None
+
+    def _setup_log_archive(self, config: OCSConfig, log_group):
+        """Stream the WAF logs to S3 via Firehose for long term storage."""
+        archive_bucket = s3.Bucket(
+            self,
+            "WAFLogArchiveBucket",
+            bucket_name=config.s3_waf_logs_bucket_name,
+            block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
+            encryption=s3.BucketEncryption.S3_MANAGED,
+            enforce_ssl=True,
+            versioned=False,
+            removal_policy=RemovalPolicy.RETAIN,
+            lifecycle_rules=[
+                s3.LifecycleRule(
+                    transitions=[
+                        s3.Transition(
+                            storage_class=s3.StorageClass.GLACIER,
+                            transition_after=Duration.days(90),
+                        )
+                    ],
+                )
+            ],
+        )
+
+        firehose_role = iam.Role(
+            self,
+            "WAFLogArchiveFirehoseRole",
+            assumed_by=iam.ServicePrincipal("firehose.amazonaws.com"),
+        )
+        # Only what Firehose needs to deliver to S3, it must not be able to delete logs
+        firehose_role.add_to_policy(
+            iam.PolicyStatement(
+                actions=[
+                    "s3:AbortMultipartUpload",
+                    "s3:GetBucketLocation",
+                    "s3:GetObject",
+                    "s3:ListBucket",
+                    "s3:ListBucketMultipartUploads",
+                    "s3:PutObject",
+                ],
+                resources=[
+                    archive_bucket.bucket_arn,
+                    archive_bucket.arn_for_objects("*"),
+                ],
+            )
+        )
+
+        delivery_stream = firehose.CfnDeliveryStream(
+            self,
+            "WAFLogArchiveStream",
+            delivery_stream_name=config.make_name("waf-logs-archive"),
+            delivery_stream_type="DirectPut",
+            extended_s3_destination_configuration=firehose.CfnDeliveryStream.ExtendedS3DestinationConfigurationProperty(
+                bucket_arn=archive_bucket.bucket_arn,
+                role_arn=firehose_role.role_arn,
+                prefix="waf-logs/",
+                # CloudWatch Logs already delivers gzip compressed records
+                compression_format="UNCOMPRESSED",
+                buffering_hints=firehose.CfnDeliveryStream.BufferingHintsProperty(
+                    interval_in_seconds=300,
+                    size_in_m_bs=5,
+                ),
+            ),
+        )
+        delivery_stream.node.add_dependency(firehose_role)
+
+        subscription_role = iam.Role(
             self,
-            config.make_name("WAFLogGroupArn"),
-            value=log_group.log_group_arn,
-            description="ARN of the WAF Log Group",
-        )
\ No newline at end of file
+            "WAFLogSubscriptionRole",
+            assumed_by=iam.ServicePrincipal(
+                "logs.amazonaws.com",
+                conditions={
+                    "ArnLike": {
+                        "aws:SourceArn": self.format_arn(service="logs", resource="*")
+                    }
+                },
+            ),
+        )
+        subscription_role.add_to_policy(
+            iam.PolicyStatement(
+                actions=["firehose:PutRecord", "firehose:PutRecordBatch"],
+                resources=[delivery_stream.attr_arn],
+            )
+        )
+
+        subscription_filter = logs.CfnSubscriptionFilter(
+            self,
+            "WAFLogSubscriptionFilter",
+            log_group_name=log_group.log_group_name,
+            filter_pattern="",
+            destination_arn=delivery_stream.attr_arn,
+            role_arn=subscription_role.role_arn,
+        )
+        subscription_filter.node.add_dependency(subscription_role)